@@ -111,6 +111,9 @@ def test_memory_persistence():
         memory1.push("user", "Test message 1")
         memory1.push("assistant", "Test response 1")
 
+        # Flush debounced writes before reloading
+        memory1.save()
+
         # Save and reload from same path
         memory_path = memory1.path
         memory2 = Memory(path = memory_path)
@@ -1,29 +1,133 @@
 import os
 import sys
+import json
+import time
 import logging
 import asyncio
 import argparse
+import functools
 import traceback
 from pathlib import Path
+from typing import Dict, Optional
 
 import httpx
 from dotenv import load_dotenv
+from dataclasses import dataclass
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
 
 sys.path.append(os.getcwd())
 logger = logging.getLogger("LLM_Connect_Validation")
 
-# Load environment variables from .env file
 env_path = Path(__file__).parent / '.env'
-if not env_path.exists():
-    logger.error(f"Environment file not found at {env_path}")
-    logger.info("Please create a .env file based on .env.example")
-    sys.exit(1)
 
-load_dotenv(env_path)
 
+@functools.cache
+def _load_env() -> None:
+    """Load environment variables from the .env file exactly once"""
+    if not env_path.exists():
+        logger.error("Environment file not found at %s", env_path)
+        logger.info("Please create a .env file based on .env.example")
+        sys.exit(1)
+
+    load_dotenv(env_path)
+
+# Shared HTTP clients, one per API key, so repeated LLM calls reuse pooled
+# keep-alive connections instead of paying a fresh TCP+TLS handshake per
+# request, and the Bearer header is built once instead of per call
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def _get_client(api_key: str = "") -> httpx.AsyncClient:
+    """Get the shared AsyncClient for an API key, creating it lazily on first use
+
+    Args:
+        api_key: LLM API key baked into the client's default headers
+
+    Returns:
+        Shared httpx.AsyncClient with connection pooling enabled
+    """
+    client = _CLIENTS.get(api_key)
+    if client is None or client.is_closed:
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        client_kwargs = dict(
+            timeout = httpx.Timeout(30.0),
+            limits = httpx.Limits(
+                max_connections = 200,
+                max_keepalive_connections = 100,
+                keepalive_expiry = 15.0,
+            ),
+            headers = headers,
+        )
+        try:
+            client = httpx.AsyncClient(http2 = True, **client_kwargs)
+        except ImportError:
+            # The optional 'h2' package is not installed, fall back to HTTP/1.1
+            client = httpx.AsyncClient(**client_kwargs)
+        _CLIENTS[api_key] = client
+    return client
+
+
+def _json_bytes(data: dict) -> bytes:
+    """Encode a request body to compact JSON bytes once, ahead of the client call"""
+    return json.dumps(data, separators = (",", ":")).encode("utf-8")
+
+
+# Cap on in-flight LLM requests so concurrent test runs respect provider RPM limits
+_SEMAPHORE: Optional[asyncio.Semaphore] = None
 
-def get_llm_config(api_key: str = None, base_url: str = None, model_name: str = None):
-    """Get and validate LLM configuration
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Get the shared concurrency semaphore, creating it lazily on first use
+
+    Returns:
+        Shared asyncio.Semaphore sized from the LLM_MAX_CONCURRENCY environment variable
+    """
+    global _SEMAPHORE
+    if _SEMAPHORE is None:
+        _SEMAPHORE = asyncio.Semaphore(int(os.environ.get("LLM_MAX_CONCURRENCY", "8")))
+    return _SEMAPHORE
+
+
+@retry(
+    stop = stop_after_attempt(5),
+    wait = wait_random_exponential(min = 1, max = 30),
+    retry = retry_if_exception_type(httpx.HTTPStatusError),
+    reraise = True,
+)
+async def _do_post(client: httpx.AsyncClient, url: str, data: dict) -> httpx.Response:
+    """POST a chat completion, backing off and retrying on HTTP errors like 429
+
+    Args:
+        client: Shared AsyncClient to send the request with
+        url: Chat completions endpoint URL
+        data: Request body
+
+    Returns:
+        Successful httpx.Response
+    """
+    async with _get_semaphore():
+        resp = await client.post(url, content = _json_bytes(data))
+    resp.raise_for_status()
+    return resp
+
+
+async def aclose_client() -> None:
+    """Close the shared AsyncClients and release pooled connections"""
+    for client in _CLIENTS.values():
+        if not client.is_closed:
+            await client.aclose()
+    _CLIENTS.clear()
+
+
+@functools.lru_cache(maxsize = None)
+def _resolve_config(api_key: str = None, base_url: str = None, model_name: str = None):
+    """Resolve and validate LLM configuration, cached per override tuple
+
+    Environment lookups and URL normalization run once per distinct set of
+    overrides; repeated calls return the cached tuple. Tests can reset the
+    cache via _resolve_config.cache_clear().
 
     Args:
         api_key: LLM API key
@@ -33,6 +137,8 @@ def get_llm_config(api_key: str = None, base_url: str = None, model_name: str =
     Returns:
         Tuple of (api_key, base_url, model_name) if valid, None otherwise
     """
+    _load_env()
+
     api_key = api_key or os.environ.get("LLM_API_KEY")
     base_url = base_url or os.environ.get("LLM_API_BASE")
     model_name = model_name or os.environ.get("LLM_MODEL")
@@ -49,6 +155,20 @@ def get_llm_config(api_key: str = None, base_url: str = None, model_name: str =
     return api_key, base_url, model_name
 
 
+def get_llm_config(api_key: str = None, base_url: str = None, model_name: str = None):
+    """Get and validate LLM configuration
+
+    Args:
+        api_key: LLM API key
+        base_url: LLM API base URL
+        model_name: LLM model name
+
+    Returns:
+        Tuple of (api_key, base_url, model_name) if valid, None otherwise
+    """
+    return _resolve_config(api_key, base_url, model_name)
+
+
 def log_config(api_key: str, base_url: str, model_name: str):
     """Log LLM configuration information
 
@@ -58,15 +178,120 @@ def log_config(api_key: str, base_url: str, model_name: str):
         model_name: LLM model name
     """
     logger.info("=" * 50)
-    logger.info(f"LLM Connection Configuration:")
-    logger.info(
-        f"LLM_API_KEY: {'*'*(len(api_key)-4) + api_key[-4:] if api_key else 'Not set'}")
-    logger.info(f"LLM_BASE_URL: {base_url}")
-    logger.info(f"LLM_MODEL_NAME: {model_name}")
+    masked_key = "*" * (len(api_key) - 4) + api_key[-4:] if api_key else "Not set"
+    logger.info("LLM Connection Configuration:")
+    logger.info("LLM_API_KEY: %s", masked_key)
+    logger.info("LLM_BASE_URL: %s", base_url)
+    logger.info("LLM_MODEL_NAME: %s", model_name)
     logger.info("=" * 50)
 
 
-async def call_llm_api(api_key: str, base_url: str, model_name: str, messages: list, max_tokens: int = 1000, tools: list = None):
+@dataclass(frozen = True)
+class LLMSession:
+    """Resolved LLM configuration bound to the shared HTTP client
+
+    Built once via open_session, so repeated calls skip the per-test
+    get_llm_config/log_config/_get_client chain.
+    """
+    api_key: str
+    base_url: str
+    model_name: str
+    client: httpx.AsyncClient
+
+    async def call(self, messages: list, max_tokens: int = 1000, tools: list = None, stream: bool = False):
+        """Call the chat completions endpoint with this session's configuration
+
+        Args:
+            messages: List of messages in chat format
+            max_tokens: Maximum number of tokens to generate
+            tools: List of tools in OpenAI API format (optional)
+            stream: Consume the response incrementally over SSE (optional)
+
+        Returns:
+            Tuple of (success_flag, response_content, full_response_data)
+        """
+        return await call_llm_api(
+            self.api_key,
+            self.base_url,
+            self.model_name,
+            messages,
+            max_tokens = max_tokens,
+            tools = tools,
+            stream = stream,
+        )
+
+
+def open_session(api_key: str = None, base_url: str = None, model_name: str = None) -> Optional[LLMSession]:
+    """Resolve and log the LLM configuration once, binding it to the shared client
+
+    Args:
+        api_key: LLM API key
+        base_url: LLM API base URL
+        model_name: LLM model name
+
+    Returns:
+        LLMSession if the configuration is complete, None otherwise
+    """
+    config = get_llm_config(api_key, base_url, model_name)
+    if not config:
+        return None
+
+    api_key, base_url, model_name = config
+    log_config(api_key, base_url, model_name)
+    return LLMSession(api_key, base_url, model_name, _get_client(api_key))
+
+
+async def call_llm_api_stream(api_key: str, base_url: str, model_name: str, messages: list, max_tokens: int = 1000, tools: list = None):
+    """Stream an LLM chat completion over SSE, yielding content deltas
+
+    Tokens surface as soon as the server emits them, so time-to-first-token
+    drops from full-generation latency to first-chunk latency.
+
+    Args:
+        api_key: LLM API key
+        base_url: LLM API base URL
+        model_name: LLM model name
+        messages: List of messages in chat format
+        max_tokens: Maximum number of tokens to generate
+        tools: List of tools in OpenAI API format (optional)
+
+    Yields:
+        Content delta strings as the server produces them
+    """
+    data = {
+        "model": model_name,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+
+    if tools:
+        data["tools"] = tools
+
+    client = _get_client(api_key)
+    async with _get_semaphore():
+        async with client.stream(
+            "POST",
+            f"{base_url}/chat/completions",
+            content = _json_bytes(data),
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                payload = line[6:]
+                if payload.strip() == "[DONE]":
+                    break
+                chunk = json.loads(payload)
+                choices = chunk.get("choices")
+                if not choices:
+                    continue
+                content = choices[0].get("delta", {}).get("content")
+                if content:
+                    yield content
+
+
+async def call_llm_api(api_key: str, base_url: str, model_name: str, messages: list, max_tokens: int = 1000, tools: list = None, stream: bool = False):
     """Universal LLM API call function
 
     Args:
@@ -76,11 +301,27 @@ async def call_llm_api(api_key: str, base_url: str, model_name: str, messages: l
         messages: List of messages in chat format
         max_tokens: Maximum number of tokens to generate
         tools: List of tools in OpenAI API format (optional)
+        stream: Consume the response incrementally over SSE (optional)
 
     Returns:
         Tuple of (success_flag, response_content, full_response_data)
     """
-    headers = {"Authorization": f"Bearer {api_key}"}
+    if stream:
+        try:
+            parts = []
+            async for delta in call_llm_api_stream(
+                api_key, base_url, model_name, messages,
+                max_tokens = max_tokens, tools = tools
+            ):
+                parts.append(delta)
+            resp_content = "".join(parts).strip()
+            logger.info("LLM Response Content: %s", resp_content)
+            return True, resp_content, None
+        except Exception as e:
+            logger.error("Unexpected Error: %s", e)
+            logger.error(traceback.format_exc())
+            return False, e, None
+
     data = {
         "model": model_name,
         "messages": messages,
@@ -91,32 +332,28 @@ async def call_llm_api(api_key: str, base_url: str, model_name: str, messages: l
         data["tools"] = tools
 
     try:
-        async with httpx.AsyncClient(timeout = 30) as client:
-            resp = await client.post(
-                f"{base_url}/chat/completions",
-                headers = headers,
-                json = data,
-            )
-            resp.raise_for_status()
-            resp_data = resp.json()
-            logger.info(f"LLM Server Returned: {resp_data}")
-
-            # Handle tool calls and normal responses
-            if "choices" in resp_data and len(resp_data["choices"]) > 0:
-                message = resp_data["choices"][0]["message"]
-                resp_content = message.get("content", "").strip()
-
-                # Log tool calls if present
-                if "tool_calls" in message:
-                    logger.info(f"LLM Tool Calls: {message['tool_calls']}")
-
-                logger.info(f"LLM Response Content: {resp_content}")
-                return True, resp_content, resp_data
-            else:
-                logger.error("Invalid response format: 'choices' field not found or empty")
-                return False, "Invalid response format", None
+        client = _get_client(api_key)
+        resp = await _do_post(client, f"{base_url}/chat/completions", data)
+        resp_data = resp.json()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("LLM Server Returned: %s", resp_data)
+
+        # Handle tool calls and normal responses
+        if "choices" in resp_data and len(resp_data["choices"]) > 0:
+            message = resp_data["choices"][0]["message"]
+            resp_content = message.get("content", "").strip()
+
+            # Log tool calls if present
+            if "tool_calls" in message:
+                logger.info("LLM Tool Calls: %s", message["tool_calls"])
+
+            logger.info("LLM Response Content: %s", resp_content)
+            return True, resp_content, resp_data
+        else:
+            logger.error("Invalid response format: 'choices' field not found or empty")
+            return False, "Invalid response format", None
     except Exception as e:
-        logger.error(f"Unexpected Error: {e}")
+        logger.error("Unexpected Error: %s", e)
         logger.error(traceback.format_exc())
         return False, e, None
 
@@ -125,6 +362,7 @@ async def test_llm_connection(
     api_key: str = None,
     base_url: str = None,
     model_name: str = None,
+    session: Optional[LLMSession] = None,
 ):
     """Test LLM connection by sending a simple query
 
@@ -132,40 +370,33 @@ async def test_llm_connection(
         api_key: LLM API key
         base_url: LLM API base URL
         model_name: LLM model name
+        session: Pre-built LLMSession (constructed on demand when omitted)
 
     Returns:
         Tuple of (success_flag, response_content)
     """
-    config = get_llm_config(api_key, base_url, model_name)
-    if not config:
+    if session is None:
+        session = open_session(api_key, base_url, model_name)
+    if session is None:
         return False, "Missing required LLM configuration parameters"
 
-    api_key, base_url, model_name = config
-    log_config(api_key, base_url, model_name)
-
     messages = [
         {"role": "user", "content": "First tell me who you are? Then Please reply with the two words 'Test Successful' and nothing else"}
     ]
 
-    success, resp_content, _ = await call_llm_api(
-        api_key,
-        base_url,
-        model_name,
-        messages,
-        max_tokens = 20
-    )
+    success, resp_content, _ = await session.call(messages, max_tokens = 20)
 
     if success and "Test Successful" in resp_content:
         logger.info("✅ LLM connection test successful!")
-        logger.info(f"Model: {model_name}")
-        logger.info(f"API Base: {base_url}")
-        logger.info(f"Response: {resp_content}")
+        logger.info("Model: %s", session.model_name)
+        logger.info("API Base: %s", session.base_url)
+        logger.info("Response: %s", resp_content)
         logger.info("=" * 50)
         return True, resp_content
     elif success:
         logger.error(
             "❌ LLM connection test failed! Response did not contain 'Test Successful'")
-        logger.error(f"Response: {resp_content}")
+        logger.error("Response: %s", resp_content)
         logger.error("=" * 50)
         return False, "Response did not contain 'Test Successful'"
     else:
@@ -178,6 +409,7 @@ async def test_llm_capabilities(
     api_key: str = None,
     base_url: str = None,
     model_name: str = None,
+    session: Optional[LLMSession] = None,
 ):
     """Test LLM capabilities by generating questions from text
 
@@ -185,30 +417,23 @@ async def test_llm_capabilities(
         api_key: LLM API key
         base_url: LLM API base URL
         model_name: LLM model name
+        session: Pre-built LLMSession (constructed on demand when omitted)
 
     Returns:
         Tuple of (success_flag, response_content)
     """
-    config = get_llm_config(api_key, base_url, model_name)
-    if not config:
+    if session is None:
+        session = open_session(api_key, base_url, model_name)
+    if session is None:
         return False, "Missing required LLM configuration parameters"
 
-    api_key, base_url, model_name = config
-    log_config(api_key, base_url, model_name)
-
     test_text = "Artificial intelligence is a branch of computer science dedicated to creating machines capable of simulating human intelligence. It involves developing systems that can perceive, reason, learn, and make decisions. The applications of artificial intelligence are wide-ranging, including natural language processing, computer vision, robotics, and expert systems."
 
     messages = [
         {"role": "user", "content": f"Using Chinese! Based on the following text, generate a high-quality question. The question should have clear direction and test understanding of the core content:\n{test_text}"}
     ]
 
-    success, resp_content, _ = await call_llm_api(
-        api_key,
-        base_url,
-        model_name,
-        messages,
-        max_tokens = 1000
-    )
+    success, resp_content, _ = await session.call(messages, max_tokens = 1000)
 
     if success:
         logger.info("✅ LLM capabilities test successful!")
@@ -227,6 +452,7 @@ async def test_llm_tools_use(
     api_key: str = None,
     base_url: str = None,
     model_name: str = None,
+    session: Optional[LLMSession] = None,
 ):
     """Test LLM's tool usage capabilities
 
@@ -234,17 +460,16 @@ async def test_llm_tools_use(
         api_key: LLM API key
         base_url: LLM API base URL
         model_name: LLM model name
+        session: Pre-built LLMSession (constructed on demand when omitted)
 
     Returns:
         Tuple of (success_flag, response_content)
     """
-    config = get_llm_config(api_key, base_url, model_name)
-    if not config:
+    if session is None:
+        session = open_session(api_key, base_url, model_name)
+    if session is None:
         return False, "Missing required LLM configuration parameters"
 
-    api_key, base_url, model_name = config
-    log_config(api_key, base_url, model_name)
-
     # Define a simple calculator tool
     calculator_tool = {
         "type": "function",
@@ -268,10 +493,7 @@ async def test_llm_tools_use(
         {"role": "user", "content": "Calculate 1234 multiplied by 5678."}
     ]
 
-    success, resp_content, full_response = await call_llm_api(
-        api_key,
-        base_url,
-        model_name,
+    success, resp_content, full_response = await session.call(
         messages,
         max_tokens = 500,
         tools = [calculator_tool]
@@ -291,13 +513,13 @@ async def test_llm_tools_use(
             if "tool_calls" in message:
                 logger.info("✅ LLM returned tool call information")
                 tool_calls = message["tool_calls"]
-                logger.info(f"Tool Calls: {tool_calls}")
+                logger.info("Tool Calls: %s", tool_calls)
 
                 # Check if calculator tool was called
                 for tool_call in tool_calls:
                     if tool_call.get("function", {}).get("name") == "calculator":
                         expr = tool_call.get("function", {}).get("arguments", "")
-                        logger.info(f"Calculator tool called with expression: {expr}")
+                        logger.info("Calculator tool called with expression: %s", expr)
                         tool_call_success = True
 
         if not tool_call_success:
@@ -310,6 +532,60 @@ async def test_llm_tools_use(
         return False, resp_content
 
 
+async def _run_all(
+    api_key: str = None,
+    base_url: str = None,
+    model_name: str = None,
+    session: Optional[LLMSession] = None,
+):
+    """Run all validation tests concurrently via asyncio.gather
+
+    Args:
+        api_key: LLM API key
+        base_url: LLM API base URL
+        model_name: LLM model name
+        session: LLMSession shared by every test (constructed on demand when omitted)
+
+    Returns:
+        Tuple of (success_flag, summary_string)
+    """
+    if session is None:
+        session = open_session(api_key, base_url, model_name)
+    if session is None:
+        return False, "Missing required LLM configuration parameters"
+
+    tests = [
+        ("connection", test_llm_connection),
+        ("capabilities", test_llm_capabilities),
+        ("tools", test_llm_tools_use),
+    ]
+
+    async def timed(name, test_func):
+        start = time.perf_counter()
+        result = await test_func(session = session)
+        logger.info("Test '%s' finished in %.2fs", name, time.perf_counter() - start)
+        return result
+
+    results = await asyncio.gather(
+        *(timed(name, test_func) for name, test_func in tests),
+        return_exceptions = True
+    )
+
+    all_passed = True
+    summary = []
+    for (name, _), result in zip(tests, results):
+        if isinstance(result, BaseException):
+            logger.error("Test '%s' raised an exception: %s", name, result)
+            all_passed = False
+            summary.append(f"{name}: error")
+        else:
+            success, _ = result
+            all_passed = all_passed and success
+            summary.append(f"{name}: {'passed' if success else 'failed'}")
+
+    return all_passed, ", ".join(summary)
+
+
 def main():
     """Main function, using argparse to handle command-line arguments
 
@@ -324,9 +600,9 @@ def main():
     parser.add_argument(
         "test_type",
         nargs = '?',
-        choices = ["connection", "capabilities", "tools"],
+        choices = ["connection", "capabilities", "tools", "all"],
         default = "capabilities",
-        help = "Test type: connection (test connection), capabilities (test question generation), tools (test tool usage) (default: capabilities)"
+        help = "Test type: connection (test connection), capabilities (test question generation), tools (test tool usage), all (run every test concurrently) (default: capabilities)"
     )
 
     # Configuration parameters
@@ -362,38 +638,43 @@ def main():
         handlers = [logging.StreamHandler()]
     )
 
-    logger.info(f"Starting LLM validation test: {args.test_type}")
+    logger.info("Starting LLM validation test: %s", args.test_type)
 
     # Select corresponding test function based on test type
     test_functions = {
         "connection": test_llm_connection,
         "capabilities": test_llm_capabilities,
-        "tools": test_llm_tools_use
+        "tools": test_llm_tools_use,
+        "all": _run_all
     }
 
     test_func = test_functions.get(args.test_type)
     if not test_func:
-        logger.error(f"Unknown test type: {args.test_type}")
-        logger.error("Valid test types: connection, capabilities, tools")
+        logger.error("Unknown test type: %s", args.test_type)
+        logger.error("Valid test types: connection, capabilities, tools, all")
         sys.exit(1)
 
+    async def run_and_cleanup():
+        """Open one session, run the selected test, then close the shared client"""
+        try:
+            session = open_session(args.api_key, args.base_url, args.model_name)
+            if session is None:
+                return False, "Missing required LLM configuration parameters"
+            return await test_func(session = session)
+        finally:
+            await aclose_client()
+
     # Run test
     try:
-        test_result, resp_content = asyncio.run(
-            test_func(
-                api_key = args.api_key,
-                base_url = args.base_url,
-                model_name = args.model_name
-            )
-        )
-        logger.info(f"Test Result: {test_result}")
+        test_result, resp_content = asyncio.run(run_and_cleanup())
+        logger.info("Test Result: %s", test_result)
         if not test_result:
             sys.exit(1)
     except KeyboardInterrupt:
         logger.info("Test interrupted by user")
         sys.exit(0)
     except Exception as e:
-        logger.error(f"Test failed with unexpected error: {e}")
+        logger.error("Test failed with unexpected error: %s", e)
         logger.error(traceback.format_exc())
         sys.exit(1)
 
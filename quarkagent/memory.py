@@ -1,16 +1,42 @@
 import os
 import time
 import json
+import atexit
+import asyncio
 import logging
+import itertools
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("QuarkAgent Memory")
 
+# Minimum interval between debounced disk writes, in seconds
+_SAVE_INTERVAL = 1.0
+
+
+def _loads(data: bytes) -> Dict[str, Any]:
+    """Parse a memory payload from JSON bytes, via orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _dumps(payload: Dict[str, Any]) -> bytes:
+    """Serialize a memory payload to indented JSON bytes, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload, option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, ensure_ascii = False, indent = 2).encode("utf-8")
+
 
 def _get_memory_dir() -> Path:
     """
@@ -28,31 +54,81 @@ def _generate_timestamped_filename() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M.json")
 
 
+# Cached file listing keyed on the directory's mtime, so repeated lookups
+# avoid re-globbing and re-stat'ing every memory file
+_MEMORY_LIST_CACHE: Optional[Tuple[int, List[Path]]] = None
+
+
+def _invalidate_memory_list_cache() -> None:
+    """Drop the cached memory file listing after a write or delete"""
+    global _MEMORY_LIST_CACHE
+    _MEMORY_LIST_CACHE = None
+
+
 def _list_memory_files() -> List[Path]:
     """
     List all memory files in memory directory sorted by creation time (oldest to newest)
     """
+    global _MEMORY_LIST_CACHE
     memory_dir = _get_memory_dir()
-    memory_files = sorted(
-        [f for f in memory_dir.glob("*.json") if f.name != "memory.json"],
-        key = lambda x: x.stat().st_ctime
-    )
+    mtime = memory_dir.stat().st_mtime_ns
+    if _MEMORY_LIST_CACHE is not None and _MEMORY_LIST_CACHE[0] == mtime:
+        return _MEMORY_LIST_CACHE[1]
+
+    # os.scandir caches stat results on each DirEntry, batching the syscalls
+    entries = [
+        entry for entry in os.scandir(memory_dir)
+        if entry.name.endswith(".json") and entry.name != "memory.json"
+    ]
+    entries.sort(key = lambda entry: entry.stat().st_ctime)
+    memory_files = [Path(entry.path) for entry in entries]
+    _MEMORY_LIST_CACHE = (mtime, memory_files)
     return memory_files
 
 
+def _delete_memory_files_sync(files_to_delete: List[Path]) -> None:
+    """Delete overflow memory files one at a time"""
+    for file in files_to_delete:
+        try:
+            file.unlink()
+            logger.info("Deleted old memory file: %s", file)
+        except Exception:
+            logger.exception("Failed to delete old memory file: %s", file)
+    _invalidate_memory_list_cache()
+
+
+async def _delete_memory_files_async(files_to_delete: List[Path]) -> None:
+    """Delete overflow memory files concurrently without blocking the event loop"""
+    results = await asyncio.gather(
+        *(asyncio.to_thread(file.unlink) for file in files_to_delete),
+        return_exceptions = True
+    )
+    for file, result in zip(files_to_delete, results):
+        if isinstance(result, BaseException):
+            logger.error("Failed to delete old memory file: %s (%s)", file, result)
+        else:
+            logger.info("Deleted old memory file: %s", file)
+    _invalidate_memory_list_cache()
+
+
 def _manage_memory_files(max_files: int = 8) -> None:
     """
     Manage memory files: keep only the most recent `max_files` files
+
+    When called from async context the unlinks are fanned out to threads so
+    cleanup latency scales with the slowest delete instead of their sum.
     """
     memory_files = _list_memory_files()
-    if len(memory_files) > max_files:
-        files_to_delete = memory_files[:len(memory_files) - max_files]
-        for file in files_to_delete:
-            try:
-                file.unlink()
-                logger.info(f"Deleted old memory file: {file}")
-            except Exception:
-                logger.exception(f"Failed to delete old memory file: {file}")
+    if len(memory_files) <= max_files:
+        return
+    files_to_delete = memory_files[:len(memory_files) - max_files]
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _delete_memory_files_sync(files_to_delete)
+    else:
+        loop.create_task(_delete_memory_files_async(files_to_delete))
 
 
 def _default_memory_path() -> Path:
@@ -83,8 +159,20 @@ class Memory:
     path: Path = field(default_factory = _default_memory_path)
     preferences: Dict[str, Any] = field(default_factory = dict)
     facts: Dict[str, Any] = field(default_factory = dict)
-    messages: List[Dict[str, str]] = field(default_factory = list)
+    messages: Deque[Dict[str, str]] = field(default_factory = deque)
     max_messages: int = 40
+    # Last rendered context keyed on (len(preferences), len(facts), len(messages))
+    _ctx_cache: Optional[Tuple[Tuple[int, int, int], str]] = field(
+        default = None, init = False, repr = False
+    )
+    _dirty: bool = field(default = False, init = False, repr = False)
+    _last_save: float = field(default = 0.0, init = False, repr = False)
+
+    def __post_init__(self) -> None:
+        # A bounded deque enforces max_messages on append without re-slicing
+        self.messages = deque(self.messages, maxlen = self.max_messages)
+        # Guarantee debounced writes reach disk when the process exits
+        atexit.register(self._flush)
 
     @classmethod
     def from_index(cls, index: int) -> "Memory":
@@ -94,64 +182,135 @@ class Memory:
         """
         path = _get_memory_path_by_index(index)
         if path:
-            logger.info(f"Loading memory from: {path}")
+            logger.info("Loading memory from: %s", path)
             return cls(path = path)
-        logger.warning(f"Memory index {index} not found, creating new memory")
+        logger.warning("Memory index %s not found, creating new memory", index)
         return cls()
 
     def load(self) -> None:
         if not self.path.exists():
             return
         try:
-            data = json.loads(self.path.read_text(encoding = "utf-8"))
+            data = _loads(self.path.read_bytes())
             self.preferences = data.get("preferences", {}) or {}
             self.facts = data.get("facts", {}) or {}
-            self.messages = data.get("messages", []) or []
+            self.messages = deque(data.get("messages", []) or [], maxlen = self.max_messages)
         except Exception:
             logger.exception("Failed to load memory")
 
+    def _serialize(self) -> bytes:
+        """Build the memory payload and serialize it to JSON bytes"""
+        payload = {
+            "updated_at": int(time.time()),
+            "preferences": self.preferences,
+            "facts": self.facts,
+            "messages": list(self.messages),
+        }
+        return _dumps(payload)
+
+    def _write_bytes_atomic(self, data: bytes) -> None:
+        """
+        Write payload bytes to a sibling tmp file and replace atomically,
+        so an interrupted save never leaves a truncated memory file
+        """
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self.path)
+        _invalidate_memory_list_cache()
+
     def save(self) -> None:
         try:
-            self.path.parent.mkdir(parents = True, exist_ok = True)
-            payload = {
-                "updated_at": int(time.time()),
-                "preferences": self.preferences,
-                "facts": self.facts,
-                "messages": self.messages[-self.max_messages :],
-            }
-            self.path.write_text(
-                json.dumps(payload, ensure_ascii = False, indent = 2),
-                encoding = "utf-8"
-            )
+            self._write_bytes_atomic(self._serialize())
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except Exception:
+            logger.exception("Failed to save memory")
+
+    async def asave(self) -> None:
+        """
+        Async variant of save: serialization happens on the caller, but the
+        disk write is offloaded to a thread so the event loop stays free.
+        """
+        try:
+            data = self._serialize()
+            await asyncio.to_thread(self._write_bytes_atomic, data)
+            self._dirty = False
+            self._last_save = time.monotonic()
         except Exception:
             logger.exception("Failed to save memory")
 
+    def _maybe_save(self) -> None:
+        """Flush dirty state to disk at most once per debounce interval"""
+        if not self._dirty:
+            return
+        if time.monotonic() - self._last_save > _SAVE_INTERVAL:
+            self.save()
+
+    def _flush(self) -> None:
+        """Write out any pending changes, bypassing the debounce interval"""
+        if self._dirty:
+            self.save()
+
     def set_preference(self, key: str, value: Any) -> None:
         self.preferences[key] = value
-        self.save()
+        self._ctx_cache = None
+        self._dirty = True
+        self._maybe_save()
 
     def set_fact(self, key: str, value: Any) -> None:
         self.facts[key] = value
-        self.save()
+        self._ctx_cache = None
+        self._dirty = True
+        self._maybe_save()
 
     def push(self, role: str, content: str) -> None:
         if not content:
             return
         self.messages.append({"role": role, "content": content})
-        self.messages = self.messages[-self.max_messages :]
-        self.save()
+        self._ctx_cache = None
+        self._dirty = True
+        self._maybe_save()
+
+    async def apush(self, role: str, content: str) -> None:
+        """
+        Async variant of push: the append is in-memory, and any due flush is
+        scheduled as a fire-and-forget task instead of blocking the loop.
+        Pending changes are still written at exit via the atexit flush.
+        """
+        if not content:
+            return
+        self.messages.append({"role": role, "content": content})
+        self._ctx_cache = None
+        self._dirty = True
+        if time.monotonic() - self._last_save > _SAVE_INTERVAL:
+            asyncio.create_task(self.asave())
 
     def context(self) -> str:
-        """Generate a compact memory context string for the LLM."""
+        """Generate a compact memory context string for the LLM.
+
+        The rendered string is cached and reused while memory is unchanged,
+        so retries and reflector loops that re-prompt the same context skip
+        the re-render entirely.
+        """
+        sig = (len(self.preferences), len(self.facts), len(self.messages))
+        if self._ctx_cache and self._ctx_cache[0] == sig:
+            return self._ctx_cache[1]
+
         parts: List[str] = []
         if self.preferences:
-            prefs = ", ".join(f"{k}={v}" for k, v in sorted(self.preferences.items()))
+            prefs = ", ".join([f"{k}={v}" for k, v in sorted(self.preferences.items())])
             parts.append(f"User preferences: {prefs}")
         if self.facts:
-            facts = ", ".join(f"{k}={v}" for k, v in sorted(self.facts.items()))
+            facts = ", ".join([f"{k}={v}" for k, v in sorted(self.facts.items())])
             parts.append(f"User facts: {facts}")
         if self.messages:
-            recent = self.messages[-10:]
-            convo = "\n".join(f"{m['role']}: {m['content']}" for m in recent)
+            recent = list(itertools.islice(
+                self.messages, max(0, len(self.messages) - 10), len(self.messages)
+            ))
+            convo = "\n".join([f"{m['role']}: {m['content']}" for m in recent])
             parts.append("Recent conversation:\n" + convo)
-        return "\n\n".join(parts).strip()
+
+        rendered = "\n\n".join(parts).strip()
+        self._ctx_cache = (sig, rendered)
+        return rendered
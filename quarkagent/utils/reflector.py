@@ -1,8 +1,21 @@
+import re
+import hashlib
+import inspect
 import logging
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
 
 logger = logging.getLogger("Reflector")
 
+# Precompiled marker for the improved-response section; a single regex pass
+# replaces lowercasing each line and running one substring search per keyword
+_IMPROVED_MARKER = re.compile(
+    r"(?i)\b(?:improved|revised|corrected|enhanced)\s+response|better\s+answer"
+)
+
+# Maximum number of (query, response) pairs remembered per Reflector instance
+_REFLECT_CACHE_SIZE = 256
+
 
 class Reflector:
     """
@@ -23,8 +36,19 @@ class Reflector:
         self.temperature = self.config.get("temperature", 0.7)
         self.disabled = self.config.get("disabled", False)
         self.max_tokens = self.config.get("max_tokens", None)
+        self.min_reflect_chars = self.config.get("min_reflect_chars", 64)
+
+        # LRU cache of reflection results keyed on a hash of (query, response),
+        # so redundant retries skip the LLM round-trip entirely
+        self._reflect_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
+        # Detect whether the injected client is async (e.g. AsyncOpenAI), so
+        # areflect can refuse to await a sync client and vice versa
+        self._is_async = inspect.iscoroutinefunction(
+            getattr(getattr(getattr(client, "chat", None), "completions", None), "create", None)
+        )
 
-        logger.debug(f"Reflector initialized, model: {model}, disabled: {self.disabled}")
+        logger.debug("Reflector initialized, model: %s, disabled: %s", model, self.disabled)
 
     def apply_reflection(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """
@@ -45,33 +69,46 @@ class Reflector:
         if len(messages) < 2:
             return messages
 
-        # Extract the last user query
-        last_user_msg = None
-        last_assistant_msg = None
-
         # Find the most recent user-assistant exchange
-        for i in range(len(messages)-1, 0, -1):
-            if messages[i]["role"] == "assistant" and last_assistant_msg is None:
-                last_assistant_msg = messages[i]["content"]
-            elif messages[i]["role"] == "user" and last_assistant_msg is not None and last_user_msg is None:
-                last_user_msg = messages[i]["content"]
-                break
+        last_user_idx, last_asst_idx = self._find_last_exchange(messages)
+        if last_user_idx < 0 or last_asst_idx < 0:
+            return messages
 
+        last_user_msg = messages[last_user_idx]["content"]
+        last_assistant_msg = messages[last_asst_idx]["content"]
         if not last_user_msg or not last_assistant_msg:
             return messages
 
         # Reflect on the response
         improved_response = self.reflect(last_user_msg, last_assistant_msg)
 
-        # If reflection improved the response, update the last assistant message
+        # If reflection improved the response, write it back by the cached index
         if improved_response and improved_response != last_assistant_msg:
-            for i in range(len(messages)-1, 0, -1):
-                if messages[i]["role"] == "assistant":
-                    messages[i]["content"] = improved_response
-                    break
+            messages[last_asst_idx]["content"] = improved_response
 
         return messages
 
+    @staticmethod
+    def _find_last_exchange(messages: List[Dict[str, str]]) -> Tuple[int, int]:
+        """
+        Locate the most recent user-assistant exchange in a single reverse pass
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Tuple of (last_user_idx, last_asst_idx), each -1 when not found
+        """
+        last_asst_idx = last_user_idx = -1
+        for i in range(len(messages) - 1, -1, -1):
+            role = messages[i]["role"]
+            if last_asst_idx < 0 and role == "assistant":
+                last_asst_idx = i
+            elif last_asst_idx >= 0 and role == "user":
+                last_user_idx = i
+                break
+        return last_user_idx, last_asst_idx
+
     def _build_reflection_prompt(self, query: str, current_response: str) -> str:
         """
         Build reflection prompt
@@ -117,23 +154,17 @@ Please provide your improved response below. If no improvement is needed, just r
             # This is a basic implementation; can be enhanced with more robust parsing
 
             # Check if there's a clear section indicating the improved response
-            lines = reflection_content.split("\n")
             improved_response = []
             capture = False
 
-            for line in lines:
-                line = line.strip()
-
+            for line in reflection_content.splitlines():
                 # Look for indicators of improved response
-                if any(keyword in line.lower() for keyword in [
-                    "improved response", "revised response", "better answer",
-                    "corrected response", "enhanced response"
-                ]):
+                if not capture and _IMPROVED_MARKER.search(line):
                     capture = True
                     continue
 
-                if capture and line:
-                    improved_response.append(line)
+                if capture and (stripped := line.strip()):
+                    improved_response.append(stripped)
 
             # If no specific section found, check if the reflection is different from original
             if improved_response:
@@ -143,47 +174,129 @@ Please provide your improved response below. If no improvement is needed, just r
                 return reflection_content
 
         except Exception as e:
-            logger.error(f"Error extracting improved response: {str(e)}")
+            logger.error("Error extracting improved response: %s", e)
             return None
 
-    def reflect(self, query: str, current_response: str) -> str:
+    def _remember(self, cache_key: bytes, response: str) -> None:
         """
-        Reflect on and improve the current response
+        Record a reflection result, evicting the oldest entry when the cache is full
+
+        Args:
+            cache_key: Hash of the (query, response) pair
+            response: Reflection result to cache
+        """
+        self._reflect_cache[cache_key] = response
+        if len(self._reflect_cache) > _REFLECT_CACHE_SIZE:
+            self._reflect_cache.popitem(last = False)
+
+    def _pre_reflect(self, query: str, current_response: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Run the cheap gates shared by reflect and areflect
 
         Args:
             query: User query
             current_response: Current LLM-generated response
 
         Returns:
-            Improved response or original response (if no improvement)
+            Tuple of (short_circuit_result, cache_key). When short_circuit_result
+            is not None, the caller returns it without an LLM call.
         """
         if self.disabled or not self.client or not self.model:
             logger.debug("Reflector is disabled or not fully configured, skipping reflection process")
-            return current_response
+            return current_response, None
 
         if not current_response.strip():
             logger.debug("Current response is empty, skipping reflection process")
+            return current_response, None
+
+        if len(current_response) < self.min_reflect_chars:
+            logger.debug("Current response is too short to benefit from reflection, skipping")
+            return current_response, None
+
+        cache_key = hashlib.blake2b(
+            f"{query}\x00{current_response}".encode(), digest_size = 16
+        ).digest()
+        if cache_key in self._reflect_cache:
+            self._reflect_cache.move_to_end(cache_key)
+            logger.debug("Returning cached reflection result for repeated query/response pair")
+            return self._reflect_cache[cache_key], cache_key
+
+        return None, cache_key
+
+    def _reflection_messages(self, reflection_prompt: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages sent to the reflection LLM
+
+        Args:
+            reflection_prompt: Rendered reflection prompt text
+
+        Returns:
+            Messages in chat format
+        """
+        return [
+            {
+                "role": "system",
+                "content": "You are a high-quality response analyzer. Your task is to evaluate and improve given responses."
+            },
+            {
+                "role": "user",
+                "content": reflection_prompt
+            }
+        ]
+
+    def _finish_reflect(self, cache_key: bytes, reflection_content: str, current_response: str) -> str:
+        """
+        Extract, cache and return the improved response from reflection content
+
+        Args:
+            cache_key: Hash of the (query, response) pair
+            reflection_content: Full reflection content from LLM
+            current_response: Current LLM-generated response
+
+        Returns:
+            Improved response or original response (if no improvement)
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received reflection content: %s...", reflection_content[:100])
+
+        # Extract improved response
+        improved_response = self._extract_improved_response(reflection_content)
+
+        # If improved response is extracted, return it
+        if improved_response and improved_response != current_response:
+            logger.info("Reflection process produced an improved response")
+            self._remember(cache_key, improved_response)
+            return improved_response
+        else:
+            logger.debug("Reflection process did not produce significant improvement")
+            self._remember(cache_key, current_response)
             return current_response
 
+    def reflect(self, query: str, current_response: str) -> str:
+        """
+        Reflect on and improve the current response
+
+        Args:
+            query: User query
+            current_response: Current LLM-generated response
+
+        Returns:
+            Improved response or original response (if no improvement)
+        """
+        short_circuit, cache_key = self._pre_reflect(query, current_response)
+        if short_circuit is not None:
+            return short_circuit
+
         try:
             # Build reflection prompt
             reflection_prompt = self._build_reflection_prompt(query, current_response)
 
-            logger.debug(f"Sending reflection prompt to LLM")
+            logger.debug("Sending reflection prompt to LLM")
 
             # Request LLM for reflection
             response = self.client.chat.completions.create(
                 model = self.model,
-                messages = [
-                    {
-                        "role": "system",
-                        "content": "You are a high-quality response analyzer. Your task is to evaluate and improve given responses."
-                    },
-                    {
-                        "role": "user",
-                        "content": reflection_prompt
-                    }
-                ],
+                messages = self._reflection_messages(reflection_prompt),
                 temperature = self.temperature,
                 max_tokens = self.max_tokens
             )
@@ -191,20 +304,90 @@ Please provide your improved response below. If no improvement is needed, just r
             # Extract reflection content
             reflection_content = response.choices[0].message.content
 
-            logger.debug(f"Received reflection content: {reflection_content[:100]}...")
+            return self._finish_reflect(cache_key, reflection_content, current_response)
 
-            # Extract improved response
-            improved_response = self._extract_improved_response(reflection_content)
+        except Exception as e:
+            logger.error("Error during reflection process: %s", e)
+            # Return original response on error
+            return current_response
 
-            # If improved response is extracted, return it
-            if improved_response and improved_response != current_response:
-                logger.info("Reflection process produced an improved response")
-                return improved_response
-            else:
-                logger.debug("Reflection process did not produce significant improvement")
-                return current_response
+    async def areflect(self, query: str, current_response: str) -> str:
+        """
+        Async variant of reflect for use with an async client (e.g. AsyncOpenAI)
+
+        Awaiting the reflection call keeps the event loop free, so reflections
+        can run concurrently with tool execution and other LLM I/O.
+
+        Args:
+            query: User query
+            current_response: Current LLM-generated response
+
+        Returns:
+            Improved response or original response (if no improvement)
+        """
+        if not self._is_async:
+            logger.debug("Client is not async, falling back to synchronous reflection")
+            return self.reflect(query, current_response)
+
+        short_circuit, cache_key = self._pre_reflect(query, current_response)
+        if short_circuit is not None:
+            return short_circuit
+
+        try:
+            # Build reflection prompt
+            reflection_prompt = self._build_reflection_prompt(query, current_response)
+
+            logger.debug("Sending reflection prompt to LLM")
+
+            # Request LLM for reflection
+            response = await self.client.chat.completions.create(
+                model = self.model,
+                messages = self._reflection_messages(reflection_prompt),
+                temperature = self.temperature,
+                max_tokens = self.max_tokens
+            )
+
+            # Extract reflection content
+            reflection_content = response.choices[0].message.content
+
+            return self._finish_reflect(cache_key, reflection_content, current_response)
 
         except Exception as e:
-            logger.error(f"Error during reflection process: {str(e)}")
+            logger.error("Error during reflection process: %s", e)
             # Return original response on error
             return current_response
+
+    async def aapply_reflection(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Async variant of apply_reflection
+
+        Args:
+            messages: Conversation messages
+
+        Returns:
+            Potentially modified messages
+        """
+        if self.disabled or not self.client or not self.model:
+            return messages
+
+        if len(messages) < 2:
+            return messages
+
+        # Find the most recent user-assistant exchange
+        last_user_idx, last_asst_idx = self._find_last_exchange(messages)
+        if last_user_idx < 0 or last_asst_idx < 0:
+            return messages
+
+        last_user_msg = messages[last_user_idx]["content"]
+        last_assistant_msg = messages[last_asst_idx]["content"]
+        if not last_user_msg or not last_assistant_msg:
+            return messages
+
+        # Reflect on the response
+        improved_response = await self.areflect(last_user_msg, last_assistant_msg)
+
+        # If reflection improved the response, write it back by the cached index
+        if improved_response and improved_response != last_assistant_msg:
+            messages[last_asst_idx]["content"] = improved_response
+
+        return messages